@@ -1,14 +1,17 @@
 import json
 import os
 import shutil
+import warnings
 from dataclasses import dataclass, asdict
+from functools import cached_property
 from datetime import datetime, timedelta
 from typing import Optional
 
 import pandas as pd
 import numpy as np
+from PIL import Image, ImageDraw
 
-from shyft.config import Config
+from shyft.config import Config, DAYS_OF_WEEK
 from shyft.geo_utils import intersect_points
 from shyft.df_utils import MILE_KM, kmph_to_mph, speed_to_pace
 from shyft.logger import get_logger
@@ -17,9 +20,26 @@ from shyft.serialize.create.tcx import activity_to_tcx_file
 from shyft.serialize.parse import parser_factory
 
 MILE = 1609.344
-pd.options.plotting.backend = "plotly"
 logger = get_logger(__name__)
 
+# Size (width, height) of route thumbnails, in pixels.
+THUMBNAIL_SIZE = (70, 50)
+# Gap (in pixels) to leave between the route and the edges of the thumbnail.
+THUMBNAIL_MARGIN = 2
+# The same blue as the default plotly line colour, to match the rest of the app.
+THUMBNAIL_COLOR = (99, 110, 250, 255)
+
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """Linearly scale `values` so that they lie in the range [0, 1]."""
+    vmin = np.nanmin(values)
+    vrange = np.nanmax(values) - vmin
+    if not vrange:
+        # All values are the same; put them in the middle.
+        return np.full_like(values, 0.5)
+    return (values - vmin) / vrange
+
+
 @dataclass
 class ActivityMetaData:
     """A dataclass representing a brief summary of an activity."""
@@ -92,7 +112,9 @@ class ActivityMetaData:
 
         # Date and time of the activity
         if self.day is None:
-            self.day = self.date_time.strftime('%A')
+            # DAYS_OF_WEEK starts on Sunday, which isoweekday() numbers 7. Indexing into it is much cheaper than
+            # strftime (and not locale-dependent).
+            self.day = DAYS_OF_WEEK[self.date_time.isoweekday() % 7]
         if self.hour is None:
             self.hour = self.date_time.hour
         if self.month is None:
@@ -163,6 +185,11 @@ class Activity:
     `pd.DataFrame`), as well as some metadata about the activity (as an
     `ActivityMetaData` object).  We only separately store data about the
     activity which cannot easily and quickly be deduced from the points.
+
+    The points DataFrame has many columns of different types, so where
+    we only need a single value we access it through the relevant
+    column (eg, `points['time'].iat[0]`) rather than materialising a
+    whole row (eg, `points.iloc[0]['time']`).
     """
 
     metadata: ActivityMetaData
@@ -178,21 +205,29 @@ class Activity:
             self.metadata = metadata
         else:
             if kwargs.get('distance_2d_km') is None:
-                kwargs['distance_2d_km'] = self.points['cumul_distance_2d'].iloc[-1] / 1000
-            if kwargs.get('center') is None:
-                kwargs['center'] = self.points[['latitude', 'longitude', 'elevation']].mean().to_numpy()
-            if kwargs.get('points_std') is None:
-                kwargs['points_std'] = self.points[['latitude', 'longitude', 'elevation']].std().to_numpy()
+                kwargs['distance_2d_km'] = self.points['cumul_distance_2d'].iat[-1] / 1000
+            if (kwargs.get('center') is None) or (kwargs.get('points_std') is None):
+                # Extract the coordinates once and reduce the resulting array, rather than building a sub-DataFrame
+                # for each statistic.
+                coords = self.points[['latitude', 'longitude', 'elevation']].to_numpy(dtype=float)
+                with warnings.catch_warnings():
+                    # As with pandas, a column with no data (usually elevation) should just give NaN.
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    if kwargs.get('center') is None:
+                        kwargs['center'] = np.nanmean(coords, axis=0)
+                    if kwargs.get('points_std') is None:
+                        kwargs['points_std'] = np.nanstd(coords, axis=0, ddof=1)
             if kwargs.get('date_time') is None:
-                kwargs['date_time'] = points.iloc[0]['time'].to_pydatetime()
+                kwargs['date_time'] = points['time'].iat[0].to_pydatetime()
             if kwargs.get('duration') is None:
-                kwargs['duration'] = self.points.iloc[-1]['time'] - kwargs['date_time']
+                kwargs['duration'] = self.points['time'].iat[-1] - kwargs['date_time']
             if (kwargs.get('thumbnail_file') is None) and config.thumbnail_dir:
                 kwargs['thumbnail_file'] = self.write_thumbnail(activity_id=kwargs['activity_id'])
+            # hr and cadence are nullable integer columns, whose mean is NA (rather than NaN) if there is no data.
             if kwargs.get('mean_hr') is None:
-                kwargs['mean_hr'] = self.points['hr'].mean()
+                kwargs['mean_hr'] = self.points['hr'].astype(float).mean()
             if kwargs.get('mean_cadence') is None:
-                kwargs['mean_cadence'] = self.points['cadence'].mean()
+                kwargs['mean_cadence'] = self.points['cadence'].astype(float).mean()
 
 
             self.metadata = ActivityMetaData(config, **kwargs)
@@ -214,26 +249,34 @@ class Activity:
         else:
             raise ValueError(f'split_col must be "km" or "mile", not "{split_col}".')
         df = self.points
-        min_split = df[split_col].min()
-        max_split = df[split_col].max()
-        markers = []
-        for i in range(int(min_split) + 1, int(max_split) + 1):
-            p1 = df[df[split_col] == i - 1].iloc[-1]
-            p2 = df[df[split_col] == i].iloc[0]
-            overrun = p2['cumul_distance_2d'] - (split_len * i)
-            underrun = (split_len * i) - p1['cumul_distance_2d']
-            portion = underrun / (underrun + overrun)
-            m = intersect_points(p1, p2, portion)
-            m['ends'] = i - 1
-            m['begins'] = i
-            markers.append(m)
-        return pd.DataFrame(markers)
-
-    @property
+        # split_col is derived from the cumulative distance, so it is sorted and we can find the first point of each
+        # split by binary search rather than scanning the whole column for each split.
+        splits = df[split_col].to_numpy()
+        split_nos = np.arange(int(splits.min()) + 1, int(splits.max()) + 1)
+        boundaries = np.searchsorted(splits, split_nos)
+        # Only take the columns we need before selecting rows, rather than copying whole rows.
+        coords = df[['latitude', 'longitude', 'elevation', 'time']]
+        p1 = coords.iloc[boundaries - 1]
+        p2 = coords.iloc[boundaries]
+        cumul_distance = df['cumul_distance_2d'].to_numpy()
+        split_distance = split_len * split_nos
+        overrun = cumul_distance[boundaries] - split_distance
+        underrun = split_distance - cumul_distance[boundaries - 1]
+        portion = underrun / (underrun + overrun)
+        markers = intersect_points(p1, p2, portion)
+        markers['ends'] = split_nos - 1
+        markers['begins'] = split_nos
+        return markers
+
+    # The markers and summaries are fairly expensive to calculate and are often needed more than once (eg, for a map
+    # overlay and a splits table), so we calculate them once per Activity. The points of an Activity are not changed
+    # after it is created, so the cached values don't go stale.
+
+    @cached_property
     def km_markers(self) -> pd.DataFrame:
         return self.get_split_markers('km')
 
-    @property
+    @cached_property
     def mile_markers(self) -> pd.DataFrame:
         return self.get_split_markers('mile')
 
@@ -249,21 +292,28 @@ class Activity:
         """
         # TODO: Use functions in df_utils for this.
         speed_col = self.get_speed_col(split_col)
-        splits = self.points[[split_col, speed_col, 'cadence', 'hr']]
-        split_no = splits[split_col] + 1
-        splits.set_index(split_no)
-        # groupby drops any null columns, so preserve and re-add these
-        null_cols = list(filter(lambda c: splits[c].isnull().all(), splits.columns))
-        summary = splits.groupby(split_col).mean()
-        for col in null_cols:
-            summary[col] = None
+        splits = self.points[split_col].to_numpy()
+        # The split column is non-decreasing, so each split is a contiguous run of points and we can take the means
+        # with np.add.reduceat over the run boundaries rather than a (hash-based) groupby.
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(splits)) + 1))
+        summary = pd.DataFrame(index=pd.Index(splits[starts], name=split_col))
+        for col in (speed_col, 'cadence', 'hr'):
+            values = self.points[col].to_numpy(dtype=float, na_value=np.nan)
+            not_null = ~np.isnan(values)
+            if not not_null.any():
+                summary[col] = None
+                continue
+            # Like groupby().mean(), ignore null values.
+            with np.errstate(invalid='ignore'):
+                summary[col] = np.add.reduceat(np.where(not_null, values, 0), starts) / np.add.reduceat(not_null, starts)
         # split_time = point in time at which split ended/began, not duration of split
-        split_times = self.get_split_markers(split_col)['time']
+        # Reuse the (cached) markers rather than calculating them again.
+        split_times = (self.km_markers if split_col == 'km' else self.mile_markers)['time']
         start_times = [self.metadata.date_time]
         start_times.extend(split_times)
         summary['start_time'] = pd.Series(start_times)
-        summary['duration'] = split_times - split_times.shift(fill_value=self.points.iloc[0]['time'])
-        summary.loc[summary.index[-1], 'duration'] = self.points.iloc[-1]['time'] - split_times.iloc[-1]
+        summary['duration'] = split_times - split_times.shift(fill_value=self.points['time'].iat[0])
+        summary.loc[summary.index[-1], 'duration'] = self.points['time'].iat[-1] - split_times.iat[-1]
         #summary['duration'] = get_lap_durations(summary, self.points)
         if split_col == 'km':
             summary['distance'] = 1000
@@ -275,11 +325,11 @@ class Activity:
             speed_col: f'mean_{speed_col}'
         })
 
-    @property
+    @cached_property
     def km_summary(self):
         return self.get_split_summary('km')
 
-    @property
+    @cached_property
     def mile_summary(self):
         return self.get_split_summary('mile')
 
@@ -294,8 +344,6 @@ class Activity:
         :return: A path to the resulting PNG file.
 
         """
-        # TODO:  Would be better not to rely on plotly / kaleido for this;
-        # maybe roll our own using pillow.
         if activity_id is None:
             activity_id = self.metadata.activity_id
 
@@ -304,37 +352,18 @@ class Activity:
 
         fpath = os.path.abspath(fpath)
 
-        fig = self.points.plot(
-            x='longitude',
-            y='latitude'
-        )
-
-        fig.update_traces(line={
-            'width': 10
-        })
-
-        fig.update_layout({
-            # Transparent background
-            'paper_bgcolor': 'rgba(0,0,0,0)',
-            'plot_bgcolor': 'rgba(0,0,0,0)',
-            # Disable axis labels, grid lines, etc
-            'xaxis': {
-                'showgrid': False,
-                'zeroline': False,
-                'visible': False,
-            },
-            'yaxis': {
-                'showgrid': False,
-                'zeroline': False,
-                'visible': False,
-            },
-            'showlegend': False
-        })
-        # The use of `scale` to resize the image relies on the default image being 700x500, which seems to always
-        # be the case with the activities I have tested.  Providing width and height arguments to write_image
-        # results in the image just being a tiny blue dot.
-        # TODO:  Find a way to explicitly specify the dimensions of the output image
-        fig.write_image(fpath, format='png', scale=0.1)
+        # Scale the route to fill the image (less a small margin). Latitude increases upwards but image y
+        # coordinates increase downwards, so the y axis is flipped.
+        width, height = THUMBNAIL_SIZE
+        lon = self.points['longitude'].to_numpy()
+        lat = self.points['latitude'].to_numpy()
+        x = THUMBNAIL_MARGIN + _normalize(lon) * (width - 2 * THUMBNAIL_MARGIN - 1)
+        y = THUMBNAIL_MARGIN + (1 - _normalize(lat)) * (height - 2 * THUMBNAIL_MARGIN - 1)
+
+        # Transparent background
+        img = Image.new('RGBA', THUMBNAIL_SIZE, (0, 0, 0, 0))
+        ImageDraw.Draw(img).line(list(zip(x.tolist(), y.tolist())), fill=THUMBNAIL_COLOR, width=1)
+        img.save(fpath, format='PNG')
         #print(f'thumbnail fpath is {fpath}')
         return fpath
 
@@ -367,14 +396,31 @@ class Activity:
 
         """
         logger.info(f'Generating activity from file: "{fpath}".')
-        fname, ext = os.path.splitext(fpath)
         try:
             parser = parser_factory(fpath, config)
         except Exception as e:
             logger.error('Could not load parser object.', exc_info=e)
             raise e
+        return Activity.from_parsed_data(fpath, parser.points, parser.laps, parser.metadata, config, activity_id,
+                                         activity_name, activity_description, activity_type)
 
-        metadata = parser.metadata
+    @staticmethod
+    def from_parsed_data(fpath: str, points: pd.DataFrame, laps: Optional[pd.DataFrame], metadata: dict,
+                         config: Config, activity_id: int, activity_name: str = None,
+                         activity_description: str = None, activity_type: str = None) -> 'Activity':
+        """
+        Create a new Activity object from data that has already been
+        parsed from the file at `fpath` (for example, by
+        `shyft.serialize.parse.parse_many`).
+
+        :param points: The points DataFrame returned by the parser.
+        :param laps: The laps DataFrame (or None) returned by the parser.
+        :param metadata: The metadata returned by the parser.
+
+        See `from_file` for the other parameters.
+
+        """
+        fname, ext = os.path.splitext(fpath)
         if activity_type is not None:
             metadata['activity_type'] = activity_type
         if activity_name is not None:
@@ -385,8 +431,8 @@ class Activity:
         try:
             activity = Activity(
                 config,
-                parser.points,
-                parser.laps,
+                points,
+                laps,
                 activity_id=activity_id,
                 **metadata
             )
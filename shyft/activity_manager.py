@@ -12,6 +12,7 @@ from shyft.geo_utils import norm_dtw, norm_length_diff, norm_center_diff
 from shyft.activity import Activity, ActivityMetaData
 from shyft.df_utils import summarize_metadata
 from shyft.logger import get_logger
+from shyft.serialize.parse import parse_many
 
 logger = get_logger(__name__)
 
@@ -32,6 +33,9 @@ class ActivityManager:
             os.makedirs(config.data_dir)
         self.dbm = DatabaseManager(config)
         self._cache: Dict[int, Activity] = {}
+        # Incremented every time an activity is added, changed or deleted, so that anything derived from the stored
+        # activities can tell whether it is out of date.
+        self.revision = 0
 
     @property
     def activity_ids(self):
@@ -103,6 +107,28 @@ class ActivityManager:
                                activity_description=activity_description, activity_type=activity_type)
         )
 
+    def add_activities_from_files(self, fpaths: Sequence[str],
+                                  n_workers: Optional[int] = None) -> List[Union[int, Exception]]:
+        """Add Activities from several files, parsing the files in
+        parallel (see `parse_many`). The Activities themselves are
+        added one at a time, in the order of `fpaths`, as IDs and route
+        matches depend on the Activities already added.
+
+        Returns a list containing, for each file, either the ID of the
+        new Activity or the exception raised when trying to add it.
+        """
+        results = []
+        for fpath, parsed in zip(fpaths, parse_many(fpaths, self.config, n_workers, return_exceptions=True)):
+            if isinstance(parsed, Exception):
+                results.append(parsed)
+                continue
+            try:
+                activity = Activity.from_parsed_data(fpath, *parsed, self.config, self.get_new_activity_id())
+                results.append(self.add_activity(activity))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def loose_match_routes(self, a1: Activity, a2: Activity) -> bool:
         return (
                 (norm_center_diff(a1.metadata.center, a2.metadata.center, a1.metadata.points_std,
@@ -144,6 +170,31 @@ class ActivityManager:
         results = self.dbm.search_activity_data(from_date, to_date, prototype, activity_type, number, ids)
         return [ActivityMetaData(self.config, **kwargs) for kwargs in results]
 
+    def search_metadata_frame(self,
+                              from_date: Optional[date] = None,
+                              to_date: Optional[date] = None,
+                              prototype: Optional[int] = None,
+                              activity_type: Optional[str] = None,
+                              number: Optional[int] = None,
+                              ids: Collection[int] = None
+                              ) -> pd.DataFrame:
+        """Like search_metadata, but return the metadata of the matching
+        activities as a DataFrame (with one row per activity and one
+        column per database field), fetched in a single query.
+
+        Activities without a name are given their default name, so the
+        `name` column can be displayed as-is.
+        """
+        df = self.dbm.search_activity_frame(from_date, to_date, prototype, activity_type, number, ids)
+        unnamed = df['name'].isna()
+        if unnamed.any():
+            # The default name can depend on any of the metadata, so we need the full ActivityMetaData objects for
+            # these (but only these) activities.
+            default_names = {m.activity_id: m.default_name
+                             for m in self.search_metadata(ids=df.loc[unnamed, 'activity_id'].tolist())}
+            df.loc[unnamed, 'name'] = df.loc[unnamed, 'activity_id'].map(default_names)
+        return df
+
     def summarize_metadata(self,
                            from_date: Optional[date] = None,
                            to_date: Optional[date] = None,
@@ -159,6 +210,9 @@ class ActivityManager:
         self.dbm.save_dataframe('points', activity.points, activity.metadata.activity_id)
         if activity.laps is not None:
             self.dbm.save_dataframe('laps', activity.laps, activity.metadata.activity_id, index_label='lap_no')
+        # Only bump the revision once everything is written, so that nothing built from the old data can be taken to be
+        # up to date.
+        self.revision += 1
 
     def get_activity_matches(self, metadata: ActivityMetaData,
                              number: Optional[int] = None) -> List[ActivityMetaData]:
@@ -186,6 +240,7 @@ class ActivityManager:
                 self.replace_prototype(metadata.activity_id, next_match_id)
             else:
                 self.dbm.delete_prototype(metadata.activity_id)
+        self.revision += 1
         if delete_gpx_file and (metadata.gpx_file is not None) and os.path.exists(metadata.gpx_file):
             os.remove(metadata.gpx_file)
         if delete_tcx_file and (metadata.tcx_file is not None) and os.path.exists(metadata.tcx_file):
@@ -203,6 +258,7 @@ class ActivityManager:
             self.dbm.save_metadata(metadata, commit=False)
         self.dbm.change_prototype(old_id, new_id, commit=False)
         self.dbm.commit()
+        self.revision += 1
 
     def get_metadata_by_month(self, month: date, **kwargs) -> List[ActivityMetaData]:
         """
@@ -1,13 +1,17 @@
 import dataclasses
 import json
 import os
+import threading
+from collections import OrderedDict
 from io import BytesIO
 from logging import ERROR
-from typing import List, Dict, Optional, Tuple, Callable
+from typing import Any, List, Dict, Optional, Tuple, Callable
 from urllib.parse import urlparse, parse_qs
 from zipfile import ZipFile
 
 import flask
+import numpy as np
+import pandas as pd
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
@@ -45,6 +49,11 @@ MIMETYPES = {
 }
 MIMETYPE_FALLBACK = 'application/octet-stream'
 
+# Pages whose content depends only on the URL, the stored activities and the configuration, and which can therefore be
+# cached until one of those changes. The empty string is the landing page.
+CACHEABLE_PAGES = {'', 'activities', 'overview', 'calendar', 'config'}
+PAGE_CACHE_SIZE = 32
+
 
 class MainController:
     """A main controllers class for use with our Dash app. This will
@@ -71,6 +80,10 @@ class MainController:
             self.activity_manager = activity_manager
         self.config = config
         self.config_fpath = config.ini_fpath
+        self._page_cache: OrderedDict[Tuple[str, int, int], List[Component]] = OrderedDict()
+        # The Flask server may handle requests in several threads at once, so all access to the page cache must be
+        # done while holding this lock.
+        self._page_cache_lock = threading.Lock()
 
         self.landing_controller = LandingPageController(self)
         self.overview_controller = OverviewController(self)
@@ -104,10 +117,10 @@ class MainController:
             params[k] = parsed[k][0]
         return params
 
-    def url_params_to_metadata(self, params: Dict[str, str]) -> List[ActivityMetaData]:
+    def _url_params_to_search_criteria(self, params: Dict[str, str]) -> Dict[str, Any]:
         """Takes a dict representing parameters of a query and returns
-        a list of ActivityMetaData objects that fit the given search
-        criteria.
+        a dict of keyword arguments that can be passed to the
+        ActivityManager's search methods.
         """
         if (from_date := params.get('from_date')) is not None:
             from_date = dp.parse(from_date).date()
@@ -119,8 +132,22 @@ class MainController:
         if (ids := params.get('id')) is not None:
             ids = id_str_to_ints(ids)
 
-        return self.activity_manager.search_metadata(from_date=from_date, to_date=to_date, prototype=prototype,
-                                                     activity_type=activity_type, ids=ids)
+        return {'from_date': from_date, 'to_date': to_date, 'prototype': prototype, 'activity_type': activity_type,
+                'ids': ids}
+
+    def url_params_to_metadata(self, params: Dict[str, str]) -> List[ActivityMetaData]:
+        """Takes a dict representing parameters of a query and returns
+        a list of ActivityMetaData objects that fit the given search
+        criteria.
+        """
+        return self.activity_manager.search_metadata(**self._url_params_to_search_criteria(params))
+
+    def url_params_to_metadata_frame(self, params: Dict[str, str]) -> pd.DataFrame:
+        """Takes a dict representing parameters of a query and returns
+        a DataFrame describing the activities that fit the given search
+        criteria (see ActivityManager.search_metadata_frame).
+        """
+        return self.activity_manager.search_metadata_frame(**self._url_params_to_search_criteria(params))
 
     def url_params_to_metadata_json(self, params: Dict[str, str], exclude_filepaths: bool = True,
                                     exclude_config: bool = True) -> str:
@@ -175,8 +202,41 @@ class MainController:
     def _id_str_to_activities(self, ids: str) -> List[Optional[Activity]]:
         return [self.activity_manager.get_activity_by_id(i) for i in id_str_to_ints(ids)]
 
+    def _page_cache_key(self, href: Optional[str]) -> Optional[Tuple[str, int, int]]:
+        """Return the key under which the content of the page at `href`
+        should be cached, or None if it should not be cached.
+        """
+        if href is None:
+            return None
+        tokens = urlparse(href).path.split('/')[1:]
+        if tokens[0] not in CACHEABLE_PAGES:
+            return None
+        return href, self.activity_manager.revision, self.config.revision
+
     def _resolve_pathname(self, href: str) -> List[Component]:
         """Resolve the URL pathname and return the appropriate page
+        content, using cached content where possible.
+        """
+        # Any pending messages are displayed (and discarded) as part of the page content, so we can only use (or cache)
+        # a page if there are no messages waiting to be displayed.
+        if (key := self._page_cache_key(href)) is None or self.msg_bus.has_messages():
+            return self._get_page_content(href)
+        with self._page_cache_lock:
+            if (content := self._page_cache.get(key)) is not None:
+                logger.debug(f'Using cached page content for URL "{href}".')
+                self._page_cache.move_to_end(key)
+                return content
+        # The page is built without holding the lock, so that other pages can still be served in the meantime.
+        content = self._get_page_content(href)
+        if not self.msg_bus.has_messages():
+            with self._page_cache_lock:
+                self._page_cache[key] = content
+                if len(self._page_cache) > PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+        return content
+
+    def _get_page_content(self, href: str) -> List[Component]:
+        """Resolve the URL pathname and build the appropriate page
         content.
         """
         logger.info(f'Resolving URL "{href}" for page content.')
@@ -260,10 +320,10 @@ class MainController:
             Output({'type': 'download_button', 'index': MATCH}, 'disabled'),
             Input({'type': 'activity_table_dropdown', 'index': MATCH}, 'value'),
             Input({'type': 'activity_table', 'index': MATCH}, 'selected_rows'),
-            State({'type': 'activity_table', 'index': MATCH}, 'data'),
+            State({'type': 'activity_table_ids', 'index': MATCH}, 'data'),
             State('url', 'pathname'),
         )
-        def set_action_links(download: str, selected_rows: List[int], data: List,
+        def set_action_links(download: str, selected_rows: List[int], activity_ids: List[int],
                              pathname: str) -> Tuple[str, bool, str, str, bool]:
             """Triggered every time an activity is selected or
             unselected, or the download dropdown value is changed.
@@ -276,10 +336,10 @@ class MainController:
             del_path = f'/delete?redirect={pathname}'
             if not selected_rows:
                 return '', True, del_path, '', True
-            ids = [str(data[i]['id']) for i in selected_rows]
-            if not ids:
+            ids = np.asarray(activity_ids)[selected_rows]
+            if not ids.size:
                 raise PreventUpdate
-            ids_str = ','.join(ids)
+            ids_str = ','.join(map(str, ids.tolist()))
             if download == 'select':
                 download_href = ''
                 download_disabled = True
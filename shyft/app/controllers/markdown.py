@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import List
 
 import dash_core_components as dcc
@@ -9,11 +10,21 @@ from shyft.app.controllers._base import _BaseDashController
 # TODO: As we will be rewriting the docs in reStructuredText, this won't work anymore. Instead the docs will be
 # compiled to HTML and we can display them using an IFrame. Or just serve them statically and link to them.
 
+
+@lru_cache(maxsize=32)
+def _load_markdown(fpath: str, mtime: float) -> str:
+    """Read the Markdown file at `fpath`. The file's modification time
+    is part of the cache key so that edits to the file are picked up.
+    """
+    with open(fpath) as f:
+        return f.read()
+
+
 class MarkdownController(_BaseDashController):
 
     def page_content(self, fname: str) -> List[Component]:
-        with open(os.path.join(self.config.user_docs_dir, f'{fname}.md')) as f:
-            markdown = f.read()
+        fpath = os.path.join(self.config.user_docs_dir, f'{fname}.md')
+        markdown = _load_markdown(fpath, os.stat(fpath).st_mtime)
         return [
             *self.dc_factory.display_all_messages(),
             dcc.Markdown(markdown),
@@ -1,7 +1,7 @@
 import base64
 import os
 from logging import ERROR
-from typing import Optional, List
+from typing import Optional, List, Union
 
 from werkzeug.utils import secure_filename
 from dash.dependencies import Input, Output, State
@@ -69,8 +69,7 @@ class UploadController(_BaseDashController):
                 raise PreventUpdate
             else:
                 if len(content_list) > 1:
-                    for content, fname in zip(content_list, fname_list):
-                        self.parse_contents(content, fname)
+                    self.parse_many_contents(content_list, fname_list)
                     return '/upload'
                 else:
                     id = self.parse_contents(content_list[0], fname_list[0])
@@ -79,7 +78,10 @@ class UploadController(_BaseDashController):
                     else:
                         return f'/activity/{id}'
 
-    def parse_contents(self, contents: str, fname: str) -> Optional[int]:
+    def save_contents(self, contents: str, fname: str) -> str:
+        """Save the contents of an uploaded file to the temporary
+        directory and return the path to the saved file.
+        """
         tmp_dir = os.path.join(self.config.data_dir, 'tmp')
         if not os.path.exists(tmp_dir):
             os.makedirs(tmp_dir)
@@ -89,13 +91,34 @@ class UploadController(_BaseDashController):
         with open(tmp_fpath, 'wb') as f:
             logger.info(f'Saving file to "{tmp_fpath}".')
             f.write(base64.b64decode(content_string))
-        try:
-            id = self.activity_manager.add_activity_from_file(tmp_fpath)
-            logger.info(f'Added new activity with ID {id}.')
-            self.msg_bus.add_message(f'Uploaded new activity from file {fname}.')
-            return id
-        except Exception as e:
-            logger.error('Error adding activity.', exc_info=e)
+        return tmp_fpath
+
+    def _report_upload(self, fname: str, result: Union[int, Exception]) -> Optional[int]:
+        """Log and display the result of adding an activity from an
+        uploaded file. `result` should be the new activity's ID or the
+        exception raised when trying to add it.
+        """
+        if isinstance(result, Exception):
+            logger.error('Error adding activity.', exc_info=result)
             self.msg_bus.add_message(f'Could not upload activity from file "{fname}". '
                                      'Check the logs for details.', severity=ERROR)
             return None
+        logger.info(f'Added new activity with ID {result}.')
+        self.msg_bus.add_message(f'Uploaded new activity from file {fname}.')
+        return result
+
+    def parse_contents(self, contents: str, fname: str) -> Optional[int]:
+        tmp_fpath = self.save_contents(contents, fname)
+        try:
+            result = self.activity_manager.add_activity_from_file(tmp_fpath)
+        except Exception as e:
+            result = e
+        return self._report_upload(fname, result)
+
+    def parse_many_contents(self, content_list: List[str], fname_list: List[str]) -> List[Optional[int]]:
+        """Like parse_contents, but for several files at once, which
+        are parsed in parallel.
+        """
+        tmp_fpaths = [self.save_contents(content, fname) for content, fname in zip(content_list, fname_list)]
+        results = self.activity_manager.add_activities_from_files(tmp_fpaths)
+        return [self._report_upload(fname, result) for fname, result in zip(fname_list, results)]
@@ -10,8 +10,8 @@ from shyft.app.controllers._base import _BaseDashController
 class ViewActivitiesController(_BaseDashController):
 
     def page_content(self, params: Dict[str, str]) -> List[Component]:
-        metadata = self.main_controller.url_params_to_metadata(params)
-        if metadata:
+        metadata = self.main_controller.url_params_to_metadata_frame(params)
+        if not metadata.empty:
             #display = self.dc_factory.activities_table(metadata, select=True, id='all_activities_table')
             display = self.dc_factory.activities_table_with_actions('view_activities', metadata,
                                                                     'view_activities_action_location')
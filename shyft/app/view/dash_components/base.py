@@ -1,4 +1,4 @@
-from typing import Optional, Iterable, List, Dict, Any
+from typing import Optional, Iterable, List, Dict, Any, Union
 
 import pandas as pd
 import plotly.express as px
@@ -80,15 +80,28 @@ class BaseDashComponentFactory:
 
         return metadata.name_or_default
 
-    def activities_table(self, metadata_list: Iterable[ActivityMetaData], select: bool = False,
+    def activities_table(self, metadata_list: Union[Iterable[ActivityMetaData], pd.DataFrame], select: bool = False,
                          **kwargs) -> dt.DataTable:
-        """A generic function to return a DataTable containing a list of activities."""
+        """A generic function to return a DataTable containing a list of activities.
+
+        `metadata_list` can also be a DataFrame as returned by
+        ActivityManager.search_metadata_frame, in which case the table
+        is built directly from its columns.
+        """
         cols = self.ACTIVITY_TABLE_BASIC_COLS[:]
-        data = [{
-            'thumb': f'![{md.activity_id}]({self.thumbnail_link(md)})',
-            'name': f'[{self.activity_name(md)}]({self.activity_link(md)})',
-            'id': md.activity_id
-        } for md in metadata_list]
+        if isinstance(metadata_list, pd.DataFrame):
+            # The name column already contains default names where the activity has no name.
+            data = [{
+                'thumb': f'![{_id}]({self.thumbnail_link(_id)})',
+                'name': f'[{name}]({self.activity_link(_id)})',
+                'id': _id
+            } for _id, name in zip(metadata_list['activity_id'].tolist(), metadata_list['name'].tolist())]
+        else:
+            data = [{
+                'thumb': f'![{md.activity_id}]({self.thumbnail_link(md.activity_id)})',
+                'name': f'[{self.activity_name(md)}]({self.activity_link(md.activity_id)})',
+                'id': md.activity_id
+            } for md in metadata_list]
         if select:
             row_selectable = 'multi'
         else:
@@ -104,8 +117,8 @@ class BaseDashComponentFactory:
             **kwargs
         )
 
-    def activities_table_with_actions(self, index: str, metadata_list: List[ActivityMetaData], location_id: str,
-                                      **table_kwargs) -> List[Component]:
+    def activities_table_with_actions(self, index: str, metadata_list: Union[List[ActivityMetaData], pd.DataFrame],
+                                      location_id: str, **table_kwargs) -> List[Component]:
         """A generic function to create an activities table with a
         "Select all" button, an "Unselect all" button and a dropdown
         menu with options to export activities.
@@ -114,6 +127,9 @@ class BaseDashComponentFactory:
         of each component.
         """
         table_id = {'type': 'activity_table', 'index': index}
+        # Stores the IDs of the activities in the table (in the same order), so that callbacks acting on the selected
+        # rows only need the IDs rather than the whole of the table's data.
+        ids_id = {'type': 'activity_table_ids', 'index': index}
         select_id = {'type': 'select_all_button', 'index': index}
         unselect_id = {'type': 'unselect_all_button', 'index': index}
         # A hidden div that stores the IDs of the activities to delete (to be send as POST request)
@@ -124,6 +140,7 @@ class BaseDashComponentFactory:
         download_link_id = {'type': 'download_link', 'index': index}
         download_button_id = {'type': 'download_button', 'index': index}
         table = self.activities_table(metadata_list, id=table_id, select=True, **table_kwargs)
+        ids_store = dcc.Store(id=ids_id, data=[row['id'] for row in table.data])
         dropdown = dcc.Dropdown(dropdown_id, options=[
             {'label': 'Download as...', 'value': 'select'},
             # The below values should correspond to the pathname to redirect to
@@ -146,7 +163,7 @@ class BaseDashComponentFactory:
             dbc.Col(download_link, width=2)
         ])
 
-        return [action_row, table]
+        return [action_row, table, ids_store]
 
     def activities_table_html(self, metadata_list: List[ActivityMetaData], select: bool = True) -> html.Table:
         """An experimental alternative to activities_table, which
@@ -168,21 +185,21 @@ class BaseDashComponentFactory:
         table_rows = [html.Tr(header_row)]
         for md in metadata_list:
             data_cells = [
-                html.Th(html.Img(src=self.thumbnail_link(md))),
-                html.Th(dcc.Link(self.activity_name(md), href=self.activity_link(md)))
+                html.Th(html.Img(src=self.thumbnail_link(md.activity_id))),
+                html.Th(dcc.Link(self.activity_name(md), href=self.activity_link(md.activity_id)))
             ]
             table_rows.append(html.Tr(data_cells))
         return html.Table(table_rows)
 
-    def activity_link(self, metadata: ActivityMetaData) -> str:
-        """Returns a (relative) link to the given activity."""
-        return f'/activity/{metadata.activity_id}'
+    def activity_link(self, activity_id: int) -> str:
+        """Returns a (relative) link to the activity with the given ID."""
+        return f'/activity/{activity_id}'
 
-    def thumbnail_link(self, metadata: ActivityMetaData) -> str:
+    def thumbnail_link(self, activity_id: int) -> str:
         """Returns a (relative) link to to the thumbnail image of the
-        given activity.
+        activity with the given ID.
         """
-        return f'/thumbnails/{metadata.activity_id}.png'
+        return f'/thumbnails/{activity_id}.png'
 
     def gpx_file_link(self, metadata: ActivityMetaData) -> str:
         """Returns a (relative) link to the GPX file associated with the
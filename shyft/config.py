@@ -9,7 +9,8 @@ import os
 import sys
 from configparser import ConfigParser, Interpolation, BasicInterpolation
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from functools import cached_property
+from typing import Any, Dict, List, Optional
 
 import appdirs
 from shyft.metadata import APP_NAME
@@ -40,63 +41,73 @@ class Config:
         self.activity_graphs_fpath = activity_graphs_fpath
         self.overview_graphs_fpath = overview_graphs_fpath
         self.kwargs = kwargs
+        # Incremented every time the configuration is (re)loaded, so that anything derived from the configuration can
+        # tell whether it is out of date.
+        self.revision = 0
 
         self.load()
 
     def read_file(self, ini_fpath: str):
         parser = ConfigParser(interpolation=None)
         parser.read(ini_fpath)
+        general = parser['general']
 
-        if not parser['general']['user_name']:
-            self.user_name = getpass.getuser()
-        else:
-            self.user_name = parser['general']['user_name']
-
-        if not parser['general']['data_dir']:
-            self.data_dir = appdirs.user_data_dir(appname=APP_NAME)
-        else:
-            self.data_dir = parser['general']['data_dir']
+        self.user_name = general['user_name'] or getpass.getuser()
+        self.data_dir = general['data_dir'] or appdirs.user_data_dir(appname=APP_NAME)
 
-        self.distance_unit = parser['general']['distance_unit']
-        self.default_activity_type = parser['general']['default_activity_type']
+        self.distance_unit = general['distance_unit']
+        self.default_activity_type = general['default_activity_type']
 
-        self.match_center_threshold = parser['general'].getfloat('match_center_threshold')
-        self.match_length_threshold = parser['general'].getfloat('match_length_threshold')
-        self.tight_match_threshold = parser['general'].getfloat('tight_match_threshold')
+        self.match_center_threshold = general.getfloat('match_center_threshold')
+        self.match_length_threshold = general.getfloat('match_length_threshold')
+        self.tight_match_threshold = general.getfloat('tight_match_threshold')
 
-        self.default_activity_name_format = parser['general']['default_activity_name_format']
-        self.week_start = parser['general']['week_start'].capitalize()
-        self.speed_measure_interval = parser['general'].getint('speed_measure_interval')
+        self.default_activity_name_format = general['default_activity_name_format']
+        self.week_start = general['week_start'].capitalize()
+        self.speed_measure_interval = general.getint('speed_measure_interval')
 
-        self.overview_activities_count = parser['general'].getint('overview_activities_count')
-        self.matched_activities_count = parser['general'].getint('matched_activities_count')
+        self.overview_activities_count = general.getint('overview_activities_count')
+        self.matched_activities_count = general.getint('matched_activities_count')
+        self.revision += 1
 
     def load(self, fpath: Optional[str] = None):
         """Load values from the given files and keyword arguments."""
 
         fpath = fpath or self.ini_fpath
+
+        # The graphs are only read from their files when first needed (see activity_graphs and overview_graphs), so
+        # just forget any that we have already read.
+        self.__dict__.pop('activity_graphs', None)
+        self.__dict__.pop('overview_graphs', None)
+
         self.read_file(fpath)
 
         for k in self.kwargs:
             setattr(self, k, self.kwargs[k])
 
-        if self.activity_graphs_fpath is not None:
-            try:
-                with open(self.activity_graphs_fpath) as f:
-                    self.activity_graphs = json.load(f)
-            except (FileNotFoundError, json.decoder.JSONDecodeError):
-                self.activity_graphs = []
-        else:
-            self.activity_graphs = []
-
-        if self.overview_graphs_fpath is not None:
-            try:
-                with open(self.overview_graphs_fpath) as f:
-                    self.overview_graphs = json.load(f)
-            except (FileNotFoundError, json.decoder.JSONDecodeError):
-                self.overview_graphs = []
-        else:
-            self.overview_graphs = []
+    @staticmethod
+    def _load_graphs(fpath: Optional[str]) -> List[Dict[str, Any]]:
+        if fpath is None:
+            return []
+        try:
+            with open(fpath) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return []
+
+    @cached_property
+    def activity_graphs(self) -> List[Dict[str, Any]]:
+        """The graphs to display on the activity page, as described in
+        the file at `activity_graphs_fpath`.
+        """
+        return self._load_graphs(self.activity_graphs_fpath)
+
+    @cached_property
+    def overview_graphs(self) -> List[Dict[str, Any]]:
+        """The graphs to display on the overview page, as described in
+        the file at `overview_graphs_fpath`.
+        """
+        return self._load_graphs(self.overview_graphs_fpath)
 
     @property
     def data_dir(self) -> str:
@@ -120,8 +131,7 @@ class Config:
 
         for _dir in (self.data_dir, self.thumbnail_dir, self.gpx_file_dir, self.tcx_file_dir, self.source_file_dir,
                      self.user_docs_dir, self.tmp_dir):
-            if not os.path.exists(_dir):
-                os.makedirs(_dir)
+            os.makedirs(_dir, exist_ok=True)
 
     @property
     def week_start(self) -> str:
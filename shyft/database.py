@@ -1,7 +1,7 @@
 import re
 import threading
 from datetime import timezone, timedelta, datetime
-from typing import Any, Dict, Optional, Sequence, List, Collection
+from typing import Any, Dict, Optional, Sequence, List, Collection, Tuple
 
 import warnings
 warnings.simplefilter('ignore', UserWarning)
@@ -274,13 +274,15 @@ class DatabaseManager:
             raise ValueError(f'No activity found with activity_id {activity_id}.')
         return activity_row_to_dict(result)
 
-    def search_activity_data(self,
-                             from_date: Optional[datetime] = None,
-                             to_date: Optional[datetime] = None,
-                             prototype: Optional[int] = None,
-                             activity_type: Optional[str] = None,
-                             number: Optional[int] = None,
-                             ids: Collection[int] = None) -> Sequence[Dict[str, Any]]:
+    def _activity_search_query(self,
+                               from_date: Optional[datetime] = None,
+                               to_date: Optional[datetime] = None,
+                               prototype: Optional[int] = None,
+                               activity_type: Optional[str] = None,
+                               ids: Collection[int] = None) -> Tuple[str, List[Any]]:
+        """Return the SQL query (and its parameters) to select the
+        activities that fit the given search criteria.
+        """
         where: List[str] = []
         params: List[Any] = []
         if from_date and to_date:
@@ -304,10 +306,33 @@ class DatabaseManager:
         query = 'SELECT * FROM "activities"'
         if where:
             query += ' WHERE ' + ' AND '.join(where)
+        return query, params
+
+    def search_activity_data(self,
+                             from_date: Optional[datetime] = None,
+                             to_date: Optional[datetime] = None,
+                             prototype: Optional[int] = None,
+                             activity_type: Optional[str] = None,
+                             number: Optional[int] = None,
+                             ids: Collection[int] = None) -> Sequence[Dict[str, Any]]:
+        query, params = self._activity_search_query(from_date, to_date, prototype, activity_type, ids)
         self.sql_execute(query, params)
         results = self.sql_fetchall()
         return [activity_row_to_dict(r) for r in results[:number]]
 
+    def search_activity_frame(self,
+                              from_date: Optional[datetime] = None,
+                              to_date: Optional[datetime] = None,
+                              prototype: Optional[int] = None,
+                              activity_type: Optional[str] = None,
+                              number: Optional[int] = None,
+                              ids: Collection[int] = None) -> pd.DataFrame:
+        """Like search_activity_data, but return the activities' rows as
+        they are stored in the database, as a single DataFrame.
+        """
+        query, params = self._activity_search_query(from_date, to_date, prototype, activity_type, ids)
+        return pd.read_sql_query(query, self.connection, params=params).iloc[:number]
+
     def get_activities_in_timerange(self,
                                     year: int = None,
                                     month: int = None,
@@ -330,11 +355,23 @@ class DatabaseManager:
         return [activity_row_to_dict(r) for r in results[:number]]
 
     def load_points(self, activity_id: int) -> pd.DataFrame:
+        """Load the points for the given activity.
+
+        The points table stores the derived columns (distances, splits,
+        speed, pace, etc) as well as the raw data, so the DataFrame is
+        used as-is and the parser's inference step is never re-run.
+        """
         points = pd.read_sql_query('SELECT * FROM "points" WHERE activity_id=?', self.connection,
                                    params=(activity_id,)).drop(['id', 'activity_id'], axis=1)
         # Convert pace-related columns from floats to timedeltas
         for col in ('km_pace', 'mile_pace', 'run_time'):
             points[col] = pd.to_timedelta(points[col], unit='ns')
+        # hr and cadence are nullable integer columns (see BaseParser.NULLABLE_INT_COLS_POINTS).
+        for col in ('hr', 'cadence'):
+            points[col] = points[col].astype('Int16')
+        # Split numbers are stored as int32 when the points are parsed (see BaseParser._infer_points_data).
+        for col in ('km', 'mile'):
+            points[col] = points[col].astype(np.int32)
         return points
 
     def load_laps(self, activity_id: int) -> Optional[pd.DataFrame]:
@@ -7,6 +7,7 @@ from __future__ import annotations
 from datetime import timedelta, datetime
 from typing import Optional, Union, List, Sequence
 
+import numpy as np
 import pandas as pd
 
 import typing
@@ -58,15 +59,24 @@ def mph_to_kmph(mph: Union[float, pd.Series]) -> Union[float, pd.Series]:
 # Functions to work out certain data about laps or splits.
 
 def get_lap_durations(laps: pd.DataFrame, points: pd.DataFrame) -> pd.Series:
-    """Get durations of laps (or splits)."""
+    """Get durations of laps (or splits), being the time from the start
+    of each lap to the start of the next (or, for the last lap, to the
+    last point).
+    """
     start_times = laps['start_time']
-    return start_times - start_times.shift(-1, fill_value=points.iloc[-1]['time'])
+    return start_times.shift(-1, fill_value=points['time'].iat[-1]) - start_times
 
 
 def get_lap_distances(points: pd.DataFrame) -> pd.Series:
     """Get approximate lap distances."""
-    first = points[['cumul_distance_2d', 'lap']].groupby('lap').first()
-    return first - first.shift(-1, fill_value=points.iloc[-1]['cumul_distance_2d'])
+    laps = points['lap'].to_numpy()
+    cumul_distance = points['cumul_distance_2d'].to_numpy()
+    # Points are in order, so each lap is a contiguous run of points and we can just look at the first point of each
+    # run rather than grouping the points by lap.
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(laps)) + 1))
+    start_distances = cumul_distance[starts]
+    return pd.Series(np.diff(start_distances, append=cumul_distance[-1]), index=pd.Index(laps[starts], name='lap'),
+                     name='distance')
 
 
 def get_lap_means(cols: List[str], points: pd.DataFrame, groupby: str = 'lap') -> pd.DataFrame:
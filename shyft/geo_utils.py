@@ -4,7 +4,6 @@ Some of these functions are based on the functions implemented in gpxpy,
 but are vectorised.
 """
 from typing import Union
-from datetime import datetime
 
 import pandas as pd
 import numpy as np
@@ -39,6 +38,40 @@ def haversine_distance(latitude_1: Union[np.ndarray, pd.Series],
     return d
 
 
+def haversine_step_distance(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    Haversine distance between each point in a sequence of points and
+    the point before it, expressed in meters. The first element of the
+    returned array is NaN, as the first point has no predecessor.
+    """
+    lat = np.radians(latitude)
+    lon = np.radians(longitude)
+    d = np.empty_like(lat)
+    d[:1] = np.nan
+
+    # The calculation is done in place (in the output array and one temporary array) as far as possible, rather than
+    # allocating a new array for each intermediate result. Each point's cos(lat) is also only calculated once.
+    a = np.subtract(lat[1:], lat[:-1], out=d[1:])
+    a *= 0.5
+    np.sin(a, out=a)
+    np.square(a, out=a)
+
+    b = np.subtract(lon[1:], lon[:-1])
+    b *= 0.5
+    np.sin(b, out=b)
+    np.square(b, out=b)
+    cos_lat = np.cos(lat)
+    b *= cos_lat[:-1]
+    b *= cos_lat[1:]
+
+    a += b
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS
+
+    return d
+
+
 def naive_distance(latitude_1: Union[float, np.ndarray],
                    longitude_1: Union[float, np.ndarray],
                    latitude_2: Union[float, np.ndarray],
@@ -61,29 +94,31 @@ def distance(latitude_1: Union[float, np.ndarray], longitude_1: Union[float, np.
         return naive_distance(latitude_1, longitude_1, latitude_2, longitude_2)
 
 
-def intersect_points(p1: pd.Series, p2: pd.Series, portion: float) -> pd.Series:
-    """Returns a pd.Series representing a point that lies `portion`
-    way between p1 and p2.
-    `portion` should be a float between 0.0 and 1.0:
-        if 0.0, the returned point will be the same as p0;
-        if 1.0, the returned point will be the same as p1;
+def intersect_points(p1: pd.DataFrame, p2: pd.DataFrame, portion: np.ndarray) -> pd.DataFrame:
+    """Returns a pd.DataFrame each row of which represents a point that
+    lies `portion` way between the corresponding rows of p1 and p2.
+    Each element of `portion` should be a float between 0.0 and 1.0:
+        if 0.0, the returned point will be the same as the row in p1;
+        if 1.0, the returned point will be the same as the row in p2;
         otherwise, the returned point will be somewhere in between.
     Assumes the points have latitude, longitude, elevation and time
-    columns (and the constructed point will have only these
-    columns).
+    columns (and the constructed points will have only these
+    columns). Where a value is missing from either point, the
+    corresponding value of the constructed point will be NaN.
     """
 
-    p3 = pd.Series(dtype=np.int64)
-    for item in ('latitude', 'longitude', 'elevation'):
-        if p1[item] or p2[item] is None:
-            p3[item] = None
-        else:
-            p3[item] = ((1 - portion) * p1[item]) + (portion * p2[item])
-    p3['time'] = datetime.fromtimestamp(
-        ((1 - portion) * p1.time.timestamp()) + (portion * p2.time.timestamp()),
-        p1.time.tzinfo
-    )
-    return p3
+    cols = ['latitude', 'longitude', 'elevation']
+    coords_1 = p1[cols].to_numpy(dtype=np.float64)
+    coords_2 = p2[cols].to_numpy(dtype=np.float64)
+    coords_3 = coords_1 + ((coords_2 - coords_1) * portion[:, np.newaxis])
+    time_1 = p1['time'].reset_index(drop=True)
+    time_2 = p2['time'].reset_index(drop=True)
+    return pd.DataFrame({
+        'latitude': coords_3[:, 0],
+        'longitude': coords_3[:, 1],
+        'elevation': coords_3[:, 2],
+        'time': time_1 + ((time_2 - time_1) * portion)
+    })
 
 
 def norm_length_diff(len_1: float, len_2: float) -> float:
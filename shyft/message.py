@@ -44,6 +44,12 @@ class MessageBus:
             logger_.log(severity, text)
         return msg
 
+    def has_messages(self) -> bool:
+        """Return whether there are any messages waiting to be
+        retrieved.
+        """
+        return bool(self._messages)
+
     def _get_predicate(self,
                        severity: int,
                        view: Optional[str],
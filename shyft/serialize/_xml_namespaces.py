@@ -12,7 +12,8 @@ TCX_NAMESPACES = {
 TCX_SCHEMALOCATION = 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2 '\
                      'http://www.garmin.com/xmlschemas/TrainingCenterDatabasev2.xsd'
 
-# Namespaces are mostly dealt with by the gpxpy library, so these are only the ones we need to use separately.
+# Elements in the core GPX namespace are matched regardless of namespace, so these are only the ones we need to use
+# separately (ie, for extensions).
 GPX_NAMESPACES = {
     'garmin_tpe': 'http://www.garmin.com/xmlschemas/TrackPointExtension/v1'
 }
\ No newline at end of file
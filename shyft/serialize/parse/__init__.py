@@ -1,7 +1,12 @@
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
 
 from shyft.config import Config
-from shyft.serialize.parse._base import BaseParser, logger
+from shyft.serialize.parse._base import BaseParser, ShyftParserError, logger
 from shyft.serialize.parse.fit import FITParser
 from shyft.serialize.parse.gpx import gpx_parser_factory
 from shyft.serialize.parse.tcx import TCXParser
@@ -14,10 +19,49 @@ PARSERS = {
 
 def parser_factory(fpath: str, config: Config) -> BaseParser:
     logger.info(f'Choosing parser for file "{fpath}".')
-    _, ext = os.path.splitext(fpath.lower())
+    _, ext = os.path.splitext(fpath)
     try:
-        parser = PARSERS[ext]
+        parser = PARSERS[ext.lower()]
     except KeyError:
         raise ValueError(f'No suitable parser found for file "{fpath}".')
     logger.info(f'Chose parser "{parser.__name__}".')
-    return parser(fpath, config)
\ No newline at end of file
+    return parser(fpath, config)
+
+
+# The data that parse_many returns for each file: the points DataFrame, the laps DataFrame (or None) and the metadata.
+ParsedData = Tuple[pd.DataFrame, Optional[pd.DataFrame], Dict[str, Any]]
+
+
+def _parse_one(fpath: str, config: Config) -> ParsedData:
+    # Parser objects may hold on to unpicklable objects (such as lxml elements), so we only send back the results.
+    # Exceptions need to be sent back too, and some (such as lxml's XMLSyntaxError) can't be pickled either.
+    try:
+        parser = parser_factory(fpath, config)
+    except Exception as e:
+        raise ShyftParserError(f'Could not parse file "{fpath}": {e!r}') from None
+    return parser.points, parser.laps, parser.metadata
+
+
+def parse_many(fpaths: Sequence[str], config: Config, n_workers: Optional[int] = None,
+               return_exceptions: bool = False) -> List[Union[ParsedData, Exception]]:
+    """Parse several files in parallel, using a pool of up to
+    `n_workers` processes (by default, one per CPU).
+
+    Returns a list of (points, laps, metadata) tuples, one per file, in
+    the same order as `fpaths`. If `return_exceptions` is True, any
+    exception raised when parsing a file is returned in place of the
+    results for that file; otherwise, the first such exception is
+    raised.
+    """
+    # Worker processes are spawned rather than forked: parse_many may be called from a multithreaded process (such as
+    # the Dash app), and a forked child could inherit locks (eg, logging handler locks) held by other threads and
+    # deadlock.
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(_parse_one, fpath, config) for fpath in fpaths]
+        results = []
+        for f in futures:
+            if return_exceptions and ((e := f.exception()) is not None):
+                results.append(e)
+            else:
+                results.append(f.result())
+        return results
@@ -1,20 +1,25 @@
 """Base classes for building parsers."""
 
+from array import array
 from datetime import datetime, timedelta
 from typing import Optional, Union, List, Dict
 
 import numpy as np
 import pandas as pd
-import gpxpy
 
 from shyft.config import Config
-from shyft.df_utils import get_lap_distances, get_lap_durations, get_lap_means
-from shyft.geo_utils import haversine_distance
+from shyft.df_utils import get_lap_distances, get_lap_durations, get_lap_means, kmph_to_mph, MILE_KM
+from shyft.geo_utils import haversine_step_distance
 from shyft.logger import get_logger
 from shyft.serialize._activity_types import SHYFT_TYPES
 
 MILE = 1609.344  # metres in a mile
 
+# From pandas 2.0, pd.to_datetime infers a single format from the first string it is given unless told to expect
+# (possibly mixed) ISO 8601 strings using format='ISO8601'. Earlier versions don't recognise that format, but parse mixed
+# ISO 8601 strings without being told to.
+TO_DATETIME_ISO8601 = int(pd.__version__.split('.')[0]) >= 2
+
 # Create a common logger for all parsers.
 logger = get_logger('parse')
 
@@ -39,6 +44,15 @@ class BaseParser:
         'lap',
         'kmph'
     )
+    # Precomputed so that checking for missing columns doesn't have to build a new set every time.
+    _INITIAL_COL_SET_POINTS = frozenset(INITIAL_COL_NAMES_POINTS)
+
+    # Heart rate and cadence are small integers which may be missing for some (or all) points, so they are stored using
+    # a nullable integer type rather than being promoted to float (or object) when values are missing.
+    NULLABLE_INT_COLS_POINTS = ('hr', 'cadence')
+    # Parsers that gather these values in int16 buffers (see _to_nullable_int) use this value to mark missing values,
+    # as neither heart rate nor cadence can be negative.
+    MISSING_INT = -1
 
     INITIAL_COL_NAMES_LAPS = (
         'lap',
@@ -72,41 +86,91 @@ class BaseParser:
             return None
 
     def _infer_points_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add the columns that can be derived from the basic points
+        data (distances, splits, speed, pace, etc).
+
+        `df` is modified in place (and returned), so callers should pass
+        a copy if they need to keep the original DataFrame unchanged.
+        """
         #logger.debug(df)
-        df = df.copy()
-        prev_lat = df['latitude'].shift()
-        prev_lon = df['longitude'].shift()
-        df['step_length_2d'] = self.distance_2d(df['latitude'], df['longitude'], prev_lat, prev_lon)
-        df['cumul_distance_2d'] = df['step_length_2d'].fillna(0).cumsum()
-        df['km'] = (df['cumul_distance_2d'] // 1000).astype(int)
-        df['mile'] = (df['cumul_distance_2d'] // MILE).astype(int)
-        df['run_time'] = df['time'] - df.iloc[0]['time']
+        step_length_2d = self.distance_2d(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+        df['step_length_2d'] = step_length_2d
+        # Treat the (NaN) first step as zero and accumulate in place, rather than have nancumsum allocate a zero-filled
+        # copy and a separate output array.
+        cumul_distance_2d = np.nan_to_num(step_length_2d, nan=0.0)
+        np.cumsum(cumul_distance_2d, out=cumul_distance_2d)
+        df['cumul_distance_2d'] = cumul_distance_2d
+        # Split numbers are small, non-negative integers, so int32 is plenty. We divide (rather than multiplying by the
+        # reciprocal) so that the splits agree exactly with the distances, and share one scratch array between both.
+        splits = np.empty_like(cumul_distance_2d)
+        df['km'] = np.floor_divide(cumul_distance_2d, 1000, out=splits).astype(np.int32)
+        df['mile'] = np.floor_divide(cumul_distance_2d, MILE, out=splits).astype(np.int32)
+        df['run_time'] = df['time'] - df['time'].iat[0]
 
         # Calculate speed / pace.
         # If we have speed from the device, calculate the other metrics from that.
         # Otherwise, calculate the metrics from the time and location data.
-        prev_time = df['time'].shift(self.config.speed_measure_interval)
-        prev_cumul_distance = df['cumul_distance_2d'].shift(self.config.speed_measure_interval)
-        interval_distance = df['cumul_distance_2d'] - prev_cumul_distance
-        interval_time = df['time'] - prev_time
-        if df['kmph'].isnull().all():
-            df['kmph'] = self._convert_speed(interval_distance / interval_time.dt.seconds)
-        df['km_pace'] = (1000 / interval_distance) * interval_time
-        df['mile_pace'] = (MILE / interval_distance) * interval_time
-        df['mph'] = (1000 * df['kmph']) / MILE
+        # The arithmetic is done on flat ndarrays (distance in metres, time in seconds) and the results are only
+        # written back to the DataFrame at the end, which avoids building a chain of intermediate Series.
+        interval = self.config.speed_measure_interval
+        interval_distance = np.full_like(cumul_distance_2d, np.nan)
+        interval_distance[interval:] = cumul_distance_2d[interval:] - cumul_distance_2d[:-interval]
+        # Subtracting the raw datetime64 values (in UTC) avoids going through pandas' Timedelta machinery.
+        times = df['time'].to_numpy(dtype='datetime64[ns]')
+        interval_seconds = np.full_like(cumul_distance_2d, np.nan)
+        interval_seconds[interval:] = (times[interval:] - times[:-interval]) / np.timedelta64(1, 's')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if df['kmph'].isnull().all():
+                df['kmph'] = self._convert_speed(interval_distance / np.floor(interval_seconds))
+            km_pace = interval_seconds * 1000 / interval_distance
+        # Pace is undefined (rather than infinite) where no distance was covered.
+        km_pace[~np.isfinite(km_pace)] = np.nan
+        df['km_pace'] = pd.to_timedelta(km_pace, unit='s')
+        # Mile-based metrics are just scaled versions of the km-based ones.
+        df['mile_pace'] = pd.to_timedelta(km_pace * MILE_KM, unit='s')
+        df['mph'] = kmph_to_mph(df['kmph'])
 
         return df
 
+    def _parse_iso_times(self, times: Union[List[Optional[str]], pd.Series]) -> Union[pd.DatetimeIndex, pd.Series]:
+        """Parse a list (or Series) of ISO 8601 timestamps (as they
+        appear in a file) into UTC datetimes, in one go. A Series is
+        returned if a Series is given.
+
+        The timestamps need not all have exactly the same format (eg,
+        some may have fractional seconds and some not).
+        """
+        if TO_DATETIME_ISO8601:
+            return pd.to_datetime(times, utc=True, format='ISO8601')
+        else:
+            return pd.to_datetime(times, utc=True)
+
+    def _to_nullable_int(self, values: Union[array, np.ndarray]) -> pd.arrays.IntegerArray:
+        """Convert a buffer of int16 values (with missing values marked
+        as MISSING_INT) to a nullable Int16 array.
+        """
+        values = np.array(values, dtype=np.int16)
+        return pd.arrays.IntegerArray(values, values == self.MISSING_INT)
+
     def _clean_points_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Do some basic cleaning of the points data."""
-        df = df.copy()
+        """Do some basic cleaning of the points data. `df` is modified
+        in place (and returned).
+        """
         df.set_index('point_no', inplace=True)
+        for col in self.NULLABLE_INT_COLS_POINTS:
+            df[col] = df[col].astype('Int16')
         df.drop_duplicates('time', ignore_index=True, inplace=True)
         return df
 
     def _handle_points_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        if missing := set(self.INITIAL_COL_NAMES_POINTS).difference(df.columns):
-            raise ValueError(f'DataFrame is missing the following columns: {missing}.')
+        """Clean the given points data and add the data that can be
+        inferred from it.
+
+        The parsers build `df` specifically to pass it here, so to avoid
+        unnecessary copies it is modified in place.
+        """
+        if missing := self._INITIAL_COL_SET_POINTS.difference(df.columns):
+            raise ValueError(f'DataFrame is missing the following columns: {set(missing)}.')
         return self._infer_points_data(self._clean_points_data(df))
 
     def _infer_laps_data(self, laps_df: pd.DataFrame, points_df: pd.DataFrame) -> pd.DataFrame:
@@ -133,8 +197,11 @@ class BaseParser:
         return laps_df
 
 
-    def distance_2d(self, lat1: pd.Series, lon1: pd.Series, lat2: pd.Series, lon2: pd.Series) -> np.ndarray:
-        return haversine_distance(lat1, lon1, lat2, lon2)
+    def distance_2d(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Return the distance between each point and the previous
+        point (NaN for the first point).
+        """
+        return haversine_step_distance(lat, lon)
 
     def _parse(self, fpath: str):
         raise NotImplementedError('Child of BaseParser must implement a _parse method.')
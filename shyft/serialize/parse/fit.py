@@ -1,9 +1,11 @@
 """Parser for FIT files."""
 
+from array import array
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List
 
 import fitdecode
+import numpy as np
 import pandas as pd
 from shyft.logger import get_logger
 from shyft.serialize.parse._base import BaseActivityParser, ShyftParserError
@@ -42,10 +44,35 @@ class FITParser(BaseActivityParser):
         'total_calories'
     )
 
+    # https://gis.stackexchange.com/questions/122186/convert-garmin-or-iphone-weird-gps-coordinates
     LATLON_TO_DECIMAL = (2 ** 32) / 360
 
+    # Latitude and longitude are stored as raw semicircles (sint32) while parsing and converted to degrees all at once
+    # at the end. Missing values are marked with the FIT protocol's own "invalid" value for sint32 fields, which can
+    # never be a real position.
+    INVALID_SEMICIRCLES = 0x7FFFFFFF
+
+    # Timestamps are likewise stored as raw FIT timestamps (seconds since the FIT epoch) and converted to UTC datetimes
+    # in a single step, rather than building a timezone-aware datetime object for every point. Missing values are marked
+    # with the "invalid" value for uint32 fields.
+    INVALID_TIMESTAMP = 0xFFFFFFFF
+    FIT_UTC_REFERENCE = 631065600  # Seconds between the Unix epoch and the FIT epoch (1989-12-31T00:00:00Z)
+
     def __init__(self, *args, **kwargs):
-        self._points_data = []
+        # Points data is stored column by column (as an array or list per column) rather than as a dict per point,
+        # which is much cheaper to build up and to convert to a DataFrame.
+        self._latitude = array('i')
+        self._longitude = array('i')
+        self._elevation = array('d')
+        self._time = array('q')
+        self._hr = array('h')
+        self._cadence = array('h')
+        self._lap_nos = array('q')
+        self._kmph = array('d')
+        # Indices of points that are waiting to be backfilled, and the number of points (from the start) that have
+        # valid latitude and longitude (after backfilling) and should therefore be kept.
+        self._backfill_rows: List[int] = []
+        self._points_to_keep = 0
         self._laps_data = []
         super().__init__(*args, **kwargs)
         self._metadata['source_format'] = 'fit'
@@ -55,35 +82,88 @@ class FITParser(BaseActivityParser):
             lat: Optional[float],
             lon: Optional[float],
             elev: Optional[float],
-            timestamp: Optional[datetime],
+            timestamp: Optional[int],
             heart_rate: Optional[int],
             cadence: Optional[int],
             speed: Optional[float]
     ):
-        data = {
-            'point_no': self._get_point_no(),
-            'latitude': None,
-            'longitude': None,
-            'elevation': elev,
-            'time': timestamp,
-            'hr': heart_rate,
-            'cadence': cadence,
-            'lap': self._lap,
-            'kmph': self._convert_speed(speed)
-        }
-
-        #if elev is None:
-        #    logger.debug('Adding point without elevation.')
-        #else:
-        #    logger.debug('Adding point with elevation.')
-
-        # https://gis.stackexchange.com/questions/122186/convert-garmin-or-iphone-weird-gps-coordinates
-        if (lat is not None):
-            data['latitude'] = lat / self.LATLON_TO_DECIMAL
-        if (lon is not None):
-            data['longitude'] = lon / self.LATLON_TO_DECIMAL
-
-        self._handle_backfill(data, self._points_data, lat, lon)
+        row = len(self._time)
+
+        self._latitude.append(self.INVALID_SEMICIRCLES if lat is None else lat)
+        self._longitude.append(self.INVALID_SEMICIRCLES if lon is None else lon)
+        self._elevation.append(np.nan if elev is None else elev)
+        self._time.append(self.INVALID_TIMESTAMP if timestamp is None else timestamp)
+        self._hr.append(self.MISSING_INT if heart_rate is None else heart_rate)
+        self._cadence.append(self.MISSING_INT if cadence is None else cadence)
+        self._lap_nos.append(self._lap)
+        self._kmph.append(np.nan if speed is None else self._convert_speed(speed))
+
+        # Sometimes, a file will report elevation without reporting lat/lon data. In this case, we store whatever
+        # data we find, and once we subsequently receive lat/lon data we "backfill" the missing data with that. Points
+        # at the end of the file that are never backfilled are discarded.
+        if (lat is None) or (lon is None):
+            self._backfill_rows.append(row)
+        else:
+            if self._backfill_rows:
+                self._backfill_points(row)
+            self._points_to_keep = row + 1
+
+    def _backfill_points(self, row: int):
+        """Fill in any missing values in the points waiting to be
+        backfilled with the corresponding values from the point at index
+        `row`.
+        """
+        for values, invalid in (
+                (self._latitude, self.INVALID_SEMICIRCLES),
+                (self._longitude, self.INVALID_SEMICIRCLES),
+                (self._time, self.INVALID_TIMESTAMP),
+                (self._hr, self.MISSING_INT),
+                (self._cadence, self.MISSING_INT)
+        ):
+            fill = values[row]
+            for i in self._backfill_rows:
+                if values[i] == invalid:
+                    values[i] = fill
+        for values in (self._elevation, self._kmph):
+            fill = values[row]
+            for i in self._backfill_rows:
+                # NaN is the only value that is not equal to itself.
+                if values[i] != values[i]:
+                    values[i] = fill
+        self._backfill_rows = []
+
+    def _to_degrees(self, semicircles: array, n: int) -> np.ndarray:
+        """Convert the first `n` values in a buffer of raw semicircles
+        to degrees (with NaN for missing values).
+        """
+        raw = np.frombuffer(semicircles, dtype=np.intc)[:n]
+        degrees = raw / self.LATLON_TO_DECIMAL
+        degrees[raw == self.INVALID_SEMICIRCLES] = np.nan
+        return degrees
+
+    def _to_datetimes(self, timestamps: array, n: int) -> pd.DatetimeIndex:
+        """Convert the first `n` values in a buffer of raw FIT
+        timestamps to UTC datetimes (with NaT for missing values).
+        """
+        raw = np.frombuffer(timestamps, dtype=np.int64)[:n]
+        times = (raw + self.FIT_UTC_REFERENCE).astype('datetime64[s]').astype('datetime64[ns]')
+        times[raw == self.INVALID_TIMESTAMP] = np.datetime64('NaT')
+        return pd.DatetimeIndex(times).tz_localize('UTC')
+
+    def _get_points_df(self) -> pd.DataFrame:
+        """Build a DataFrame from the points data we have gathered."""
+        n = self._points_to_keep
+        return pd.DataFrame({
+            'point_no': np.arange(n),
+            'latitude': self._to_degrees(self._latitude, n),
+            'longitude': self._to_degrees(self._longitude, n),
+            'elevation': np.frombuffer(self._elevation, dtype=np.float64)[:n],
+            'time': self._to_datetimes(self._time, n),
+            'hr': self._to_nullable_int(np.frombuffer(self._hr, dtype=np.int16)[:n]),
+            'cadence': self._to_nullable_int(np.frombuffer(self._cadence, dtype=np.int16)[:n]),
+            'lap': np.frombuffer(self._lap_nos, dtype=np.int64)[:n],
+            'kmph': np.frombuffer(self._kmph, dtype=np.float64)[:n]
+        })
 
     def _parse_record(self, frame: fitdecode.FitDataMessage):
         """Parse a FitDataMessage of type `record`, which contains
@@ -96,7 +176,7 @@ class FITParser(BaseActivityParser):
                 frame.get_value('position_lat', fallback=None),
                 frame.get_value('position_long', fallback=None),
                 frame.get_value('altitude', fallback=None),
-                frame.get_value('timestamp'),
+                frame.get_value('timestamp', raw_value=True),
                 frame.get_value('heart_rate', fallback=None),
                 frame.get_value('cadence', fallback=None),
                 frame.get_value('speed', fallback=None)
@@ -143,7 +223,7 @@ class FITParser(BaseActivityParser):
                         self._parse_session(frame)
 
 
-        self._points = self._handle_points_data(pd.DataFrame(self._points_data, columns=self.INITIAL_COL_NAMES_POINTS))
+        self._points = self._handle_points_data(self._get_points_df())
         self._laps = self._infer_laps_data(
             pd.DataFrame(self._laps_data, columns=self.INITIAL_COL_NAMES_LAPS).set_index('lap'),
             self._points
@@ -1,13 +1,15 @@
 """Parser for GPX files."""
 
 import re
+from array import array
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Optional, Generator, Tuple, Dict, Union, Any, List
+from typing import Optional, Generator, Dict, Union, Any, List
 
+import numpy as np
 import pandas as pd
 import lxml.etree
-import gpxpy
-from gpxpy import gpx
+import dateutil.parser as dp
 from shyft.config import Config
 from shyft.serialize._xml_namespaces import GPX_NAMESPACES
 from shyft.serialize.parse._base import ShyftParserError, BaseParser, logger
@@ -35,23 +37,91 @@ class BaseGPXParser(BaseParser, metaclass=GPXParserType):
     PATTERN: Optional[Union[str, re.Pattern]] = None
     EXCEPTION = GPXParserError
 
-    def __init__(self, gpx: gpxpy.gpx.GPX, fpath: str, config: Config):
+    def __init__(self, fpath: str, config: Config):
         self._points_df = None
-        self._gpx = gpx
+        self._xml_root: Optional[lxml.etree._Element] = None
         super().__init__(fpath, config)
         self._metadata['source_format'] = 'gpx'
 
     def _parse(self, fpath: str):
-        df = pd.DataFrame(self._iter_point_data(), columns=self.INITIAL_COL_NAMES_POINTS)
-        self._points_df = self._handle_points_data(df)
+        latitude = array('d')
+        longitude = array('d')
+        elevation = array('d')
+        time: List[Optional[str]] = []
+        # Any additional data for the nullable integer columns is gathered straight into int16 buffers.
+        int_cols = {col: array('h') for col in self.NULLABLE_INT_COLS_POINTS}
+        additional = defaultdict(list)
+        for elem in self._iter_point_elems(fpath):
+            data = self._get_basic_point_data(elem)
+            latitude.append(data['latitude'])
+            longitude.append(data['longitude'])
+            elevation.append(data['elevation'])
+            time.append(data['time'])
+            for k, v in self._get_additional_point_data(elem).items():
+                if k in int_cols:
+                    int_cols[k].append(self.MISSING_INT if v is None else v)
+                else:
+                    additional[k].append(v)
+        # Any columns for which we have no data are filled with NaN.
+        data = dict.fromkeys(self.INITIAL_COL_NAMES_POINTS, np.nan)
+        data.update(
+            point_no=np.arange(len(latitude)),
+            latitude=np.frombuffer(latitude, dtype=np.float64),
+            longitude=np.frombuffer(longitude, dtype=np.float64),
+            elevation=np.frombuffer(elevation, dtype=np.float64),
+            time=self._parse_times(time),
+            **additional,
+            **{k: self._to_nullable_int(v) for k, v in int_cols.items() if v}
+        )
+        self._points_df = self._handle_points_data(pd.DataFrame(data))
         self._metadata = self._parse_metadata()
         self._metadata['source_format'] = 'gpx'
+        # We have now extracted everything we need from the document, so don't keep it in memory for the lifetime
+        # of the parser.
+        self._xml_root = None
+
+    def _parse_times(self, time: List[Optional[str]]) -> pd.DatetimeIndex:
+        """Parse the timestamps of all points (as they appear in the
+        file) in one go, which is much faster than parsing them one by
+        one.
+
+        All times are converted to the UTC offset of the first point,
+        so that we get a single datetime64 column even if the offsets
+        in the file are inconsistent. If the first time has no offset,
+        the times are returned as naive datetimes.
+        """
+        times = self._parse_iso_times(time)
+        offset = dp.parse(time[0]).utcoffset() if (time and time[0]) else None
+        if offset is None:
+            return times.tz_localize(None)
+        elif offset:
+            return times.tz_convert(timezone(offset))
+        else:
+            return times
+
+    def _find_text(self, path: str) -> Optional[str]:
+        """Return the text of the first element matching `path` (which
+        is relative to the root gpx element), or None if no such element
+        exists. Namespaces are ignored.
+        """
+        return self._xml_root.findtext('/'.join(f'{{*}}{tag}' for tag in path.split('/')))
+
+    def _find_metadata_text(self, tag: str) -> Optional[str]:
+        """Return the text of the given metadata element, or None if no
+        such element exists. In GPX 1.1 these elements are found in the
+        metadata element; in GPX 1.0 they are direct children of the
+        root gpx element.
+        """
+        text = self._find_text(f'metadata/{tag}')
+        if text is None:
+            text = self._find_text(tag)
+        return text
 
     def _parse_metadata(self) -> Dict[str, Any]:
-        """Parse activity metadata from GPX object and return as a dict."""
+        """Parse activity metadata from the GPX file and return as a dict."""
         return {
-            'name': self._gpx.name,
-            'description': self._gpx.description,
+            'name': self._find_metadata_text('name'),
+            'description': self._find_metadata_text('desc'),
             'date_time': self._get_activity_time(),
             'activity_type': self._get_activity_type()
         }
@@ -60,9 +130,10 @@ class BaseGPXParser(BaseParser, metaclass=GPXParserType):
         """Return the time the activity was recorded, if specified,
         or None otherwise.
         """
-        time = self._gpx.time
+        time = self._find_metadata_text('time')
         if time is not None:
-            return time.replace(tzinfo=timezone(time.tzinfo.utcoffset(None)))
+            time = dp.parse(time)
+            return time.replace(tzinfo=timezone(time.utcoffset()))
         else:
             return None
 
@@ -73,7 +144,7 @@ class BaseGPXParser(BaseParser, metaclass=GPXParserType):
         This value must then be converted to a useful type by the
         _get_activity_type method.
         """
-        return self._gpx.tracks[0].type
+        return self._find_text('trk/type')
 
     def _get_activity_type(self) -> str:
         """Return the type of the activity. Must be one of the activity
@@ -83,30 +154,32 @@ class BaseGPXParser(BaseParser, metaclass=GPXParserType):
         """
         return DEFAULT_TYPE
 
-    def _get_basic_point_data(self, point: gpx.GPXTrackPoint) -> Dict[str, Union[int, float, datetime, None]]:
-        """Return a dict containing a point's latitude, longitude,
-        elevation (or None, if no elevation data is present) and the
-        time at which it was recorded.
+    def _get_basic_point_data(self, elem: lxml.etree._Element) -> Dict[str, Union[float, str, None]]:
+        """Return a dict containing a trkpt element's latitude,
+        longitude, elevation (or NaN, if no elevation data is present)
+        and the time at which it was recorded (as it appears in the
+        file; timestamps are parsed together once all points have been
+        read).
 
         This is the data that a trkpt element must (or may) have
         according to the GPX schema, ignoring any extensions (which
         should be handled in other methods that may be implemented by
         subclasses).
         """
-        # Convert tz from "SimpleTZ" (used by gpxpy)
-        time = point.time.replace(tzinfo=timezone(point.time.tzinfo.utcoffset(None)))
+        elevation = elem.findtext('{*}ele')
         return {
-            'latitude': point.latitude,
-            'longitude': point.longitude,
-            'elevation': point.elevation,
-            'time': time
+            'latitude': float(elem.get('lat')),
+            'longitude': float(elem.get('lon')),
+            'elevation': float(elevation) if elevation else np.nan,
+            'time': elem.findtext('{*}time')
         }
 
-    def _get_additional_point_data(self, point: gpx.GPXTrackPoint) -> Dict[str, Any]:
-        """Takes a GPXTrackPoint object and returns a dict containing
+    def _get_additional_point_data(self, elem: lxml.etree._Element) -> Dict[str, Any]:
+        """Takes a trkpt element and returns a dict containing
         additional data about the point, which may be derived from
         extensions (for example). The keys and values should conform to
-        the schema for the points DataFrame.
+        the schema for the points DataFrame, and the same keys should
+        be returned for every point.
 
         By default, returns an empty dict; this method may be
         overridden by subclasses in order to provide more information
@@ -115,18 +188,21 @@ class BaseGPXParser(BaseParser, metaclass=GPXParserType):
 
         return {}
 
-    def _iter_point_data(self) -> Generator[Dict[str, Union[int, float, datetime, None]], None, None]:
-        """Generator which iterates through the trackpoints stored in
-        the GPX object and yields a dict containing data about each
-        point, which will be used to construct the points DataFrame.
-
-        The keys and values should conform to the schema for the points
-        DataFrame.
+    def _iter_point_elems(self, fpath: str) -> Generator[lxml.etree._Element, None, None]:
+        """Generator which streams through the GPX file and yields each
+        trkpt element in turn. Each element is cleared (and removed from
+        its parent) once it has been handled, so that we do not need to
+        hold the whole document in memory.
         """
-        for point in self._gpx.walk(only_points=True):
-            data = self._get_basic_point_data(point)
-            data |= self._get_additional_point_data(point)
-            yield data
+        context = lxml.etree.iterparse(fpath, events=('end',), tag='{*}trkpt')
+        for _, elem in context:
+            yield elem
+            elem.clear()
+            # Clearing an element empties it but leaves it in the tree, so also delete the (already handled) trkpt
+            # elements that precede it.
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        self._xml_root = context.root
 
     @property
     def points(self) -> pd.DataFrame:
@@ -161,29 +237,24 @@ class GarminGPXParser(BaseGPXParser):
     # Namespaces for extensions
     NAMESPACES = GPX_NAMESPACES
 
+    # Paths (relative to a trkpt element) to the heart rate and cadence data in Garmin's TrackPointExtension element.
+    # Looking these up directly means a single traversal per value, rather than first searching the extensions for
+    # the TrackPointExtension element.
+    HR_PATH = f'{{*}}extensions/{{{GPX_NAMESPACES["garmin_tpe"]}}}*/{{{GPX_NAMESPACES["garmin_tpe"]}}}hr'
+    CAD_PATH = f'{{*}}extensions/{{{GPX_NAMESPACES["garmin_tpe"]}}}*/{{{GPX_NAMESPACES["garmin_tpe"]}}}cad'
+
     def _get_hr(self, elem: lxml.etree._Element) -> Optional[int]:
-        try:
-            return int(elem.find('garmin_tpe:hr', self.NAMESPACES).text)
-        except AttributeError:
-            # "text" attribute not found, so presumably None
-            return None
+        hr = elem.findtext(self.HR_PATH)
+        return int(hr) if hr else None
 
     def _get_cad(self, elem: lxml.etree._Element) -> Optional[int]:
-        try:
-            return int(elem.find('garmin_tpe:cad', self.NAMESPACES).text)
-        except AttributeError:
-            return None
-
-    def _get_garmin_tpe(self, point: gpx.GPXTrackPoint) -> lxml.etree._Element:
-        for ext in point.extensions:
-            if ext.tag.startswith(f'{{{self.NAMESPACES["garmin_tpe"]}}}'):
-                return ext
+        cad = elem.findtext(self.CAD_PATH)
+        return int(cad) if cad else None
 
-    def _get_additional_point_data(self, point: gpx.GPXTrackPoint) -> Dict[str, Any]:
-        garmin_tpe = self._get_garmin_tpe(point)
+    def _get_additional_point_data(self, elem: lxml.etree._Element) -> Dict[str, Any]:
         return {
-            'hr': self._get_hr(garmin_tpe),
-            'cadence': self._get_cad(garmin_tpe)
+            'hr': self._get_hr(elem),
+            'cadence': self._get_cad(elem)
         }
 
     def _get_activity_type(self) -> str:
@@ -219,16 +290,25 @@ class RunkeeperGPXParser(BaseGPXParser):
     ACTIVITY_TYPES = RK_GPX_TO_SHYFT
 
     def _get_activity_type(self) -> str:
-        track_name = self._gpx.tracks[0].name
+        track_name = self._find_text('trk/name')
         return self.ACTIVITY_TYPES.get(track_name.split(' ')[0], DEFAULT_TYPE)
 
 
+def _get_creator(fpath: str) -> str:
+    """Return the creator attribute of the root gpx element of a GPX
+    file, without parsing the rest of the file.
+    """
+    # We only read as far as the first element, so open the file ourselves to make sure it is closed straight away
+    # (rather than when the iterparse object is garbage collected).
+    with open(fpath, 'rb') as f:
+        _, elem = next(lxml.etree.iterparse(f, events=('start',)))
+        return elem.get('creator', '')
+
+
 def gpx_parser_factory(fpath: str, config: Config) -> BaseGPXParser:
     catchalls = []
     matched = []
-    with open(fpath) as f:
-        gpx = gpxpy.parse(f)
-    creator = gpx.creator
+    creator = _get_creator(fpath)
 
     logger.info(f'Choosing GPX parser for GPX file with creator "{creator}".')
 
@@ -259,4 +339,4 @@ def gpx_parser_factory(fpath: str, config: Config) -> BaseGPXParser:
 
     logger.info(f'Chose GPX parser {parser.__name__}.')
 
-    return parser(gpx, fpath, config)
+    return parser(fpath, config)
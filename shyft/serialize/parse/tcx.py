@@ -59,6 +59,8 @@ class TCXParser(BaseActivityParser):
             laps_data.append(lap_data)
             self._iter_points(lap, points_data, lap_no)
         points_df = pd.DataFrame(points_data, columns=self.INITIAL_COL_NAMES_POINTS)
+        # Parsing all the timestamps in one go is much faster than parsing them one by one.
+        points_df['time'] = self._parse_iso_times(points_df['time'])
         self._points_df = self._handle_points_data(points_df)
         self._laps_df = self._infer_laps_data(
             pd.DataFrame(laps_data, columns=self.INITIAL_COL_NAMES_LAPS).set_index('lap'),
@@ -80,23 +82,24 @@ class TCXParser(BaseActivityParser):
                     lon = data['longitude'] = float(lon_elem.text)
 
             if (time_elem := point_elem.find('Time', self.NAMESPACES)) is not None:
-                data['time'] = dp.parse(time_elem.text).astimezone(timezone.utc)
+                # Timestamps are parsed together once all points have been read.
+                data['time'] = time_elem.text
             if (elev_elem := point_elem.find('AltitudeMeters', self.NAMESPACES)) is not None:
                 data['elevation'] = float(elev_elem.text)
             if (hr_elem := point_elem.find('HeartRateBpm', self.NAMESPACES)) is not None:
-                data['hr'] = float(hr_elem.find('Value', self.NAMESPACES).text)
+                data['hr'] = int(hr_elem.find('Value', self.NAMESPACES).text)
 
             # Cadence and speed can be recorded differently in different files:
             # - sometimes as direct children of the Trackpoint element (as Cadence and Speed);
             # - sometimes as children of the Extensions element
             #   (as activity_extension:RunCadence and activity_extension:Speed)
             if (cad_elem := point_elem.find('Cadence', self.NAMESPACES)) is not None:
-                data['cadence'] = float(cad_elem.text)
+                data['cadence'] = int(cad_elem.text)
             if (speed_elem := point_elem.find('.//activity_extension:Speed', self.NAMESPACES)) is not None:
                 data['kmph'] = self._convert_speed(float(speed_elem.text))
             if cad_elem is None:
                 if (cad_ext_elem := point_elem.find('.//activity_extension:RunCadence', self.NAMESPACES)) is not None:
-                    data['cadence'] = float(cad_ext_elem.text)
+                    data['cadence'] = int(cad_ext_elem.text)
 
             self._handle_backfill(data, points_data, lat, lon)
 
@@ -75,6 +75,9 @@ TEST_GPX_FILES_2 = [os.path.join(TEST_GPX_FILES_DIR, f'{fname}.gpx') for fname i
 TEST_FIT_FILES = [os.path.join(TEST_FIT_FILES_DIR, f'{fname}.fit') for fname in FIT_TCX_GPX]
 TEST_TCX_FILES = [os.path.join(TEST_TCX_FILES_DIR, f'{fname}.tcx') for fname in FIT_TCX_GPX]
 
+# A GPX 1.0 file (with metadata directly under the root gpx element, and timestamps in mixed formats)
+GPX_1_0_FILE = os.path.join(TEST_GPX_FILES_DIR, 'gpx_1_0.gpx')
+
 # GPX files generated by Runkeeper
 RK_GPX_DIR = os.path.join(TEST_GPX_FILES_DIR, 'runkeeper')
 RK_GPX_FILES = [os.path.join(RK_GPX_DIR, f'{fname}.gpx') for fname in FIT_TCX_GPX]
@@ -10,6 +10,7 @@ class MessagingTestCase(unittest.TestCase):
     def test_01_add_get_messages(self):
         """Test basic adding and fetching of messages."""
         mbus1 = MessageBus()
+        self.assertFalse(mbus1.has_messages())
         msg1 = mbus1.add_message(
             'Test message 1 (defaults).'
         )
@@ -36,6 +37,8 @@ class MessagingTestCase(unittest.TestCase):
         self.assertEqual(msg3.severity, DEBUG)
         self.assertSetEqual(msg3.views, {'test_view', 'test_view2'})
 
+        self.assertTrue(mbus1.has_messages())
+
         mbus2 = mbus1.copy()
         self.assertEqual(mbus1, mbus2)
 
@@ -69,6 +72,7 @@ class MessagingTestCase(unittest.TestCase):
 
         mbus2.get_messages(discard_less_severe=True)
         self.assertListEqual(mbus2._messages, [])
+        self.assertFalse(mbus2.has_messages())
 
 
 
@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime, timezone
 
 import lxml.etree
 from shyft.logger import get_logger
@@ -206,6 +207,20 @@ class SerializeTestCase(BaseTestCase):
             )
         self.assert_manager_valid(manager_rkgpx)
 
+    def test_11_gpx_1_0(self):
+        """Test parsing of GPX 1.0 files, where metadata is found
+        directly under the root gpx element.
+        """
+        parser = parser_factory(GPX_1_0_FILE, CONFIG_STRAVAGPX)
+        self.assertEqual(parser.metadata['name'], 'GPX 1.0 test run')
+        self.assertEqual(parser.metadata['description'], 'A short run recorded in GPX 1.0 format.')
+        self.assertEqual(parser.date_time, datetime(2020, 8, 5, 7, 30, tzinfo=timezone.utc))
+        # Timestamps with and without fractional seconds should all be parsed.
+        self.assertListEqual(
+            (parser.points['time'] - parser.points['time'].iat[0]).dt.total_seconds().tolist(),
+            [0, 1, 2.5, 4]
+        )
+
 
 if __name__ == '__main__':
     unittest.main()